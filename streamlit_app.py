@@ -1,54 +1,49 @@
 import streamlit as st
 import yfinance as yf
 import pandas as pd
+import polars as pl
+import numpy as np
 import altair as alt
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # ================================================================
 # Utility: auto-detect close/open/volume columns
 # ================================================================
-def detect_close_column(df):
-    cols = [c for c in df.columns if c.startswith("close")]
-    if cols:
-        return cols[0]
-    cols = [c for c in df.columns if "close" in c.lower()]
-    if not cols:
+PRICE_ROOTS = ("close", "open", "high", "low", "vol")
+
+def detect_columns(df):
+    # One scan over the (lower-cased) columns: {root: column}. A column that
+    # starts with the root wins over one that merely contains it.
+    prefix, contains = {}, {}
+    for c in df.columns:
+        for root in PRICE_ROOTS:
+            if c.startswith(root):
+                prefix.setdefault(root, c)
+            elif root in c:
+                contains.setdefault(root, c)
+    lookup = {**contains, **prefix}
+    if "close" not in lookup:
         raise ValueError(f"No CLOSE-like column found! Columns = {df.columns}")
-    return cols[0]
-
-def detect_open_column(df):
-    cols = [c for c in df.columns if c.startswith("open")]
-    if cols:
-        return cols[0]
-    cols = [c for c in df.columns if "open" in c.lower()]
-    return cols[0] if cols else None
-
-def detect_volume_column(df):
-    vols = [c for c in df.columns if "vol" in c.lower()]
-    if not vols:
+    if "vol" not in lookup:
         raise ValueError(f"No VOLUME column found! Columns = {df.columns}")
-    return vols[0]
-
-def detect_high_column(df):
-    highs = [c for c in df.columns if c.startswith("high")]
-    if highs:
-        return highs[0]
-    highs = [c for c in df.columns if "high" in c.lower()]
-    return highs[0] if highs else None
-
-def detect_low_column(df):
-    lows = [c for c in df.columns if c.startswith("low")]
-    if lows:
-        return lows[0]
-    lows = [c for c in df.columns if "low" in c.lower()]
-    return lows[0] if lows else None
+    return lookup
+
+def downsample(df, n=5000):
+    # Stride-decimate to at most n rows for charting, always keeping the latest bar
+    step = max(1, -(-len(df) // n))
+    return df.iloc[(len(df) - 1) % step::step]
 
 # ================================================================
 # Normalize yfinance dataframe
 # ================================================================
-def normalize_df(df):
-    df = df.copy()
+def as_numeric(s):
+    # yfinance already hands back typed columns; only parse when they aren't
+    return s if pd.api.types.is_numeric_dtype(s) else pd.to_numeric(s, errors="coerce")
 
+def normalize_df(df):
+    # Mutates in place: callers pass the fresh frame handed out by fetch_ohlc.
     if isinstance(df.columns, pd.MultiIndex):
         df.columns = ["_".join([str(c) for c in col if c]) for col in df.columns]
 
@@ -62,76 +57,143 @@ def normalize_df(df):
             datetime_col = col
             break
 
-    df["Datetime"] = pd.to_datetime(df[datetime_col])
+    dt = df[datetime_col]
+    df["Datetime"] = dt if pd.api.types.is_datetime64_any_dtype(dt) else pd.to_datetime(dt)
 
     # price & volume
-    df["close"] = pd.to_numeric(df[detect_close_column(df)], errors="coerce")
-    df["open"] = pd.to_numeric(df[detect_open_column(df)], errors="coerce")
-    df["high"] = pd.to_numeric(df[detect_high_column(df)], errors="coerce")
-    df["low"] = pd.to_numeric(df[detect_low_column(df)], errors="coerce")
-    df["volume"] = pd.to_numeric(df[detect_volume_column(df)], errors="coerce")
+    # float32 is ample for quote precision and halves the price columns' footprint
+    cols = detect_columns(df)
+    df["close"] = as_numeric(df[cols["close"]]).astype(np.float32)
+    df["open"] = as_numeric(df[cols["open"]]).astype(np.float32)
+    df["high"] = as_numeric(df[cols["high"]]).astype(np.float32)
+    df["low"] = as_numeric(df[cols["low"]]).astype(np.float32)
+    df["volume"] = as_numeric(df[cols["vol"]])
 
     return df
 
+def frame_fingerprint(df):
+    # Cheap cache key: shape, columns, first/last timestamp and the last
+    # (still-forming) bar, instead of hashing every cell.
+    if df.empty:
+        return (df.shape, tuple(df.columns))
+    return (df.shape, tuple(df.columns), df.index[0], df.index[-1], tuple(df.iloc[-1]))
+
+# The fingerprint changes with every tick of the live bar and only the latest
+# entry per symbol is ever reused, so keep the fingerprint-keyed caches small.
+CACHE_MAX_ENTRIES = 32
+
+@st.cache_data(hash_funcs={pd.DataFrame: frame_fingerprint}, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def normalize_cached(df):
+    return normalize_df(df)
+
+def split_by_ticker(df, tickers):
+    # group_by="ticker" nests columns as (ticker, field); a lone ticker may
+    # come back flat depending on the yfinance version.
+    if isinstance(df.columns, pd.MultiIndex):
+        level0 = set(df.columns.get_level_values(0))
+        if level0 & set(tickers):
+            # Unknown/delisted symbols come back all-NaN (or not at all): empty frame
+            return [(t, df[t].dropna(how="all") if t in level0 else pd.DataFrame()) for t in tickers]
+    return [(tickers[0], df)]
+
 # ================================================================
 # STRATEGIES (same as before)
 # ================================================================
+def polars_source(df, *cols):
+    # Lazy Polars view of the given pandas columns (NaN -> null, matching pandas' skipna)
+    return pl.DataFrame({c: df[c].to_numpy() for c in cols}, nan_to_null=True).lazy()
+
+def attach_columns(df, out):
+    for name in out.columns:
+        df[name] = out[name].to_numpy()
+    return df
+
+def with_polars(df, *exprs):
+    # Evaluate all indicator expressions in one fused Polars pass and attach the
+    # resulting columns back onto the pandas frame. Only the source columns the
+    # expressions actually reference are handed over.
+    roots = {name for e in exprs for name in e.meta.root_names()}
+    return attach_columns(df, polars_source(df, *roots).select(*exprs).collect())
+
+# Signals live in {-1, 0, 1}; int8 keeps the column at one byte per row
+BUY, HOLD, SELL = np.int8(1), np.int8(0), np.int8(-1)
+
+def crossover_signal(a, b):
+    # +1 where a > b, -1 where a < b, 0 otherwise (NaN warm-up rows included)
+    return (a > b).astype(np.int8) - (a < b).astype(np.int8)
+
+def threshold_signal(buy, sell):
+    # +1 on buy, -1 on sell (sell wins when both fire), 0 otherwise
+    return np.where(sell, SELL, np.where(buy, BUY, HOLD))
+
 def strat_ma(df, fast=5, slow=20):
-    df["ma_fast"] = df["close"].rolling(fast).mean()
-    df["ma_slow"] = df["close"].rolling(slow).mean()
-    df["signal"] = 0
-    df.loc[df["ma_fast"] > df["ma_slow"], "signal"] = 1
-    df.loc[df["ma_fast"] < df["ma_slow"], "signal"] = -1
+    close = pl.col("close")
+    df = with_polars(df,
+                     close.rolling_mean(fast).alias("ma_fast"),
+                     close.rolling_mean(slow).alias("ma_slow"))
+    df["signal"] = crossover_signal(df["ma_fast"].to_numpy(), df["ma_slow"].to_numpy())
     return df
 
 def strat_rsi(df, length=14):
-    delta = df["close"].diff()
-    gain = delta.clip(lower=0).rolling(length).mean()
-    loss = -delta.clip(upper=0).rolling(length).mean()
-    rs = gain / loss
-    df["rsi"] = 100 - (100 / (1 + rs))
-    df["signal"] = 0
-    df.loc[df["rsi"] < 30, "signal"] = 1
-    df.loc[df["rsi"] > 70, "signal"] = -1
+    delta = pl.col("close").diff()
+    gain = delta.clip(lower_bound=0).rolling_mean(length)
+    loss = -delta.clip(upper_bound=0).rolling_mean(length)
+    df = with_polars(df, (100 - (100 / (1 + gain / loss))).alias("rsi"))
+    rsi = df["rsi"].to_numpy()
+    df["signal"] = threshold_signal(rsi < 30, rsi > 70)
     return df
 
 def strat_macd(df):
-    df["ema12"] = df["close"].ewm(span=12).mean()
-    df["ema26"] = df["close"].ewm(span=26).mean()
-    df["macd"] = df["ema12"] - df["ema26"]
-    df["signal_line"] = df["macd"].ewm(span=9).mean()
-    df["hist"] = df["macd"] - df["signal_line"]
-    df["signal"] = (df["macd"] > df["signal_line"]).astype(int) - (df["macd"] < df["signal_line"]).astype(int)
-    return df
+    # Staged with_columns so each EMA is computed exactly once: nesting the
+    # expressions instead makes Polars re-evaluate ema12/ema26 inside macd and
+    # signal_line. The two independent EMAs run in parallel in the first stage.
+    close, macd, signal_line = pl.col("close"), pl.col("macd"), pl.col("signal_line")
+    out = (polars_source(df, "close")
+           .with_columns(close.ewm_mean(span=12).forward_fill().alias("ema12"),
+                         close.ewm_mean(span=26).forward_fill().alias("ema26"))
+           .with_columns((pl.col("ema12") - pl.col("ema26")).alias("macd"))
+           .with_columns(macd.ewm_mean(span=9).alias("signal_line"))
+           .with_columns((macd - signal_line).alias("hist"),
+                         ((macd > signal_line).cast(pl.Int8) - (macd < signal_line).cast(pl.Int8))
+                         .fill_null(0).alias("signal"))
+           .drop("close")
+           .collect())
+    return attach_columns(df, out)
 
 def strat_bbands(df, length=20, mult=2):
-    df["ma"] = df["close"].rolling(length).mean()
-    df["std"] = df["close"].rolling(length).std()
-    df["upper"] = df["ma"] + mult * df["std"]
-    df["lower"] = df["ma"] - mult * df["std"]
-    df["signal"] = 0
-    df.loc[df["close"] < df["lower"], "signal"] = 1
-    df.loc[df["close"] > df["upper"], "signal"] = -1
+    ma = pl.col("close").rolling_mean(length)
+    std = pl.col("close").rolling_std(length)
+    df = with_polars(df,
+                     ma.alias("ma"),
+                     std.alias("std"),
+                     (ma + mult * std).alias("upper"),
+                     (ma - mult * std).alias("lower"))
+    close = df["close"].to_numpy()
+    df["signal"] = threshold_signal(close < df["lower"].to_numpy(), close > df["upper"].to_numpy())
     return df
 
 def strat_breakout(df, length=20):
-    df["recent_high"] = df["close"].rolling(length).max()
-    df["recent_low"] = df["close"].rolling(length).min()
-    df["signal"] = 0
-    df.loc[df["close"] > df["recent_high"], "signal"] = 1
-    df.loc[df["close"] < df["recent_low"], "signal"] = -1
+    df = with_polars(df,
+                     pl.col("close").rolling_max(length).alias("recent_high"),
+                     pl.col("close").rolling_min(length).alias("recent_low"))
+    close = df["close"].to_numpy()
+    df["signal"] = threshold_signal(close > df["recent_high"].to_numpy(), close < df["recent_low"].to_numpy())
     return df
 
 def strat_vwap(df):
-    df["cum_vol"] = df["volume"].cumsum()
-    df["cum_pv"] = (df["close"] * df["volume"]).cumsum()
-    df["vwap"] = df["cum_pv"] / df["cum_vol"]
-    df["signal"] = (df["close"] > df["vwap"]).astype(int) - (df["close"] < df["vwap"]).astype(int)
+    close = df["close"].to_numpy(dtype=float)
+    volume = df["volume"].to_numpy(dtype=float)
+    pv = close * volume
+    # nancumsum skips missing bars like pandas' cumsum; re-mask them afterwards
+    vwap = np.nancumsum(pv) / np.nancumsum(volume)
+    vwap[np.isnan(pv)] = np.nan
+    df["vwap"] = vwap
+    df["signal"] = crossover_signal(close, vwap)
     return df
 
 def strat_momentum(df, length=10):
-    df["mom"] = df["close"].diff(length)
-    df["signal"] = (df["mom"] > 0).astype(int) - (df["mom"] < 0).astype(int)
+    df = with_polars(df, pl.col("close").diff(length).alias("mom"))
+    df["signal"] = crossover_signal(df["mom"].to_numpy(), 0)
     return df
 
 STRATEGY_MAP = {
@@ -144,13 +206,47 @@ STRATEGY_MAP = {
     "Momentum": strat_momentum,
 }
 
+@st.cache_data(hash_funcs={pd.DataFrame: frame_fingerprint}, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def run_strategy(df, name, params=()):
+    # Keyed on the frame fingerprint, so indicators are only recomputed when a
+    # new bar arrives or the live bar moves. params: tuple of (name, value) pairs.
+    return STRATEGY_MAP[name](df, **dict(params))
+
+# ================================================================
+# Chart encodings (built once, reused on every rerun)
+# ================================================================
+X_TIME = alt.X("Datetime:T")
+UP_COLOR, DOWN_COLOR = "#26a69a", "#ef5350"   # green / red
+# Colors are precomputed per row ("vcolor"), so Vega skips per-row condition evaluation
+BAR_COLOR = alt.Color("vcolor:N", scale=None)
+
+WICK_ENC = dict(x=X_TIME, y2="high:Q", color=BAR_COLOR)
+BODY_ENC = dict(x=X_TIME, y2="close:Q", color=BAR_COLOR)
+BUY_ENC = dict(x=X_TIME, y="buy_price:Q")
+SELL_ENC = dict(x=X_TIME, y="sell_price:Q")
+VOLUME_ENC = dict(x=X_TIME, y=alt.Y("volume:Q", axis=alt.Axis(title="Volume")), color=BAR_COLOR)
+
+# Columns shipped to the browser: candles and volume bars share one projection
+# (Altair serializes an identical dataset once); markers get their own slices.
+CHART_COLS = ("Datetime", "open", "high", "low", "close", "volume")
+BUY_COLS = ("Datetime", "buy_price")
+SELL_COLS = ("Datetime", "sell_price")
+
+# Price-panel overlay lines per strategy: (column, color)
+OVERLAYS = {
+    "MA Crossover": [("ma_fast", "orange"), ("ma_slow", "red")],
+    "Bollinger Bands": [("upper", "yellow"), ("lower", "yellow")],
+    "VWAP": [("vwap", "purple")],
+}
+
 # ================================================================
 # Streamlit UI
 # ================================================================
 st.set_page_config(page_title="Real-Time Strategy Dashboard", layout="wide")
 
 st.sidebar.title("⚙ Settings")
-ticker = st.sidebar.text_input("Ticker:", "INTC").upper()
+ticker = st.sidebar.text_input("Ticker(s), space separated:", "INTC").upper()
+tickers = list(dict.fromkeys(ticker.replace(",", " ").split()))
 interval = st.sidebar.selectbox("Interval:", ["1m", "5m", "15m", "30m", "60m", "1d"])
 period = st.sidebar.selectbox("History Range:", ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "max"])
 strategy_name = st.sidebar.selectbox("Strategy:", list(STRATEGY_MAP.keys()))
@@ -167,7 +263,20 @@ if run_btn:
 if stop_btn:
     st.session_state.running = False
 
-st.title(f"📈 Live Trading Dashboard — {ticker} ({strategy_name})")
+st.title(f"📈 Live Trading Dashboard — {' '.join(tickers)} ({strategy_name})")
+
+if not tickers:
+    st.info("Enter at least one ticker symbol.")
+    st.stop()
+
+# ================================================================
+# Data fetch (cached so intra-interval reruns skip the network)
+# ================================================================
+@st.cache_data(ttl=max(1, refresh_sec - 1), show_spinner=False)
+def fetch_ohlc(tickers, period, interval):
+    # One cached call for the whole watchlist; yfinance runs the per-symbol requests concurrently
+    return yf.download(tickers, period=period, interval=interval, group_by="ticker",
+                       auto_adjust=False, progress=False, threads=True)
 
 # ================================================================
 # MAIN LOOP
@@ -283,13 +392,16 @@ st.title(f"📈 Live Trading Dashboard — {ticker} ({strategy_name})")
 #     st.rerun()
 
 
-def run_cycle():
+def prepare_ticker(df_raw):
+    return run_strategy(normalize_cached(df_raw), strategy_name)
+
+
+def render_ticker(symbol, prepared):
     try:
-        df = normalize_df(yf.download(ticker, period=period, interval=interval))
-        df = STRATEGY_MAP[strategy_name](df)
+        df = prepared.result()
 
         # Determine Signal
-        latest = df.iloc[-1]["signal"]
+        latest = df["signal"].iat[-1]
         if latest == 1:
             st.subheader("📢 Signal: **BUY** 🟢")
         elif latest == -1:
@@ -300,8 +412,9 @@ def run_cycle():
         # ============================================================
         # CREATE BUY / SELL MARKERS
         # ============================================================
-        df["buy"] = df["signal"].apply(lambda x: 1 if x == 1 else None)
-        df["sell"] = df["signal"].apply(lambda x: 1 if x == -1 else None)
+        sig = df["signal"].to_numpy()
+        df["buy"] = np.where(sig == 1, 1.0, np.nan)
+        df["sell"] = np.where(sig == -1, 1.0, np.nan)
 
         df["buy_price"] = df["high"] * 1.002
         df["sell_price"] = df["low"] * 0.998
@@ -309,77 +422,49 @@ def run_cycle():
         # ============================================================
         # PRICE CANDLESTICK CHART
         # ============================================================
-        y_min = float(df["low"].min()) * 0.995
-        y_max = float(df["high"].max()) * 1.005
+        # nan-aware reductions on the raw arrays; float() because float32 scalars aren't JSON-serializable
+        y_min = float(np.nanmin(df["low"].to_numpy())) * 0.995
+        y_max = float(np.nanmax(df["high"].to_numpy())) * 1.005
         price_scale = alt.Scale(domain=[y_min, y_max])
 
-        candle_base = alt.Chart(df)
+        # Scale comes from the full frame; only the decimated rows are shipped to the browser
+        df_plot = downsample(df)
+
+        overlays = OVERLAYS.get(strategy_name, [])
+        chart_data = df_plot[[*CHART_COLS, *(col for col, _ in overlays)]]
+        chart_data = chart_data.assign(vcolor=np.where(chart_data["close"].to_numpy() >= chart_data["open"].to_numpy(),
+                                                       UP_COLOR, DOWN_COLOR))
+        candle_base = alt.Chart(chart_data)
 
         # Wick lines
-        candle_wick = candle_base.mark_rule().encode(
-            x="Datetime:T",
-            y=alt.Y("low:Q", scale=price_scale),
-            y2="high:Q",
-            color=alt.condition("datum.open <= datum.close",
-                                alt.value("#26a69a"),
-                                alt.value("#ef5350"))
-        )
+        candle_wick = candle_base.mark_rule().encode(y=alt.Y("low:Q", scale=price_scale), **WICK_ENC)
 
         # Candle body
-        candle_body = candle_base.mark_bar(size=5).encode(
-            x="Datetime:T",
-            y=alt.Y("open:Q", scale=price_scale),
-            y2="close:Q",
-            color=alt.condition("datum.open <= datum.close",
-                                alt.value("#26a69a"),
-                                alt.value("#ef5350"))
-        )
+        candle_body = candle_base.mark_bar(size=5).encode(y=alt.Y("open:Q", scale=price_scale), **BODY_ENC)
 
         price_chart = candle_wick + candle_body
 
         # Strategy overlays
-        if strategy_name == "MA Crossover":
-            price_chart += candle_base.mark_line(color="orange").encode(y="ma_fast:Q")
-            price_chart += candle_base.mark_line(color="red").encode(y="ma_slow:Q")
-
-        if strategy_name == "Bollinger Bands":
-            price_chart += candle_base.mark_line(color="yellow").encode(y="upper:Q")
-            price_chart += candle_base.mark_line(color="yellow").encode(y="lower:Q")
-
-        if strategy_name == "VWAP":
-            price_chart += candle_base.mark_line(color="purple").encode(y="vwap:Q")
+        for col, color in overlays:
+            price_chart += candle_base.mark_line(color=color).encode(x=X_TIME, y=f"{col}:Q")
 
         # ============================================================
         # BUY / SELL ARROWS
         # ============================================================
-        buy_marks = alt.Chart(df[df["buy"] == 1]).mark_text(
+        buy_marks = alt.Chart(df_plot.loc[df_plot["buy"] == 1, list(BUY_COLS)]).mark_text(
             text="↑", color="#00e676", fontSize=18, dy=-10
-        ).encode(
-            x="Datetime:T",
-            y="buy_price:Q"
-        )
+        ).encode(**BUY_ENC)
 
-        sell_marks = alt.Chart(df[df["sell"] == -1]).mark_text(
+        sell_marks = alt.Chart(df_plot.loc[df_plot["sell"] == 1, list(SELL_COLS)]).mark_text(
             text="↓", color="#ff1744", fontSize=18, dy=10
-        ).encode(
-            x="Datetime:T",
-            y="sell_price:Q"
-        )
+        ).encode(**SELL_ENC)
 
         price_chart = price_chart + buy_marks + sell_marks
 
         # ============================================================
         # VOLUME BARS
         # ============================================================
-        volume_chart = alt.Chart(df).mark_bar().encode(
-            x="Datetime:T",
-            y=alt.Y("volume:Q", axis=alt.Axis(title="Volume")),
-            color=alt.condition(
-                "datum.close >= datum.open",
-                alt.value("#26a69a"),   # green
-                alt.value("#ef5350")    # red
-            )
-        ).properties(height=120)
+        volume_chart = alt.Chart(chart_data).mark_bar().encode(**VOLUME_ENC).properties(height=120)
 
         # Combine price + volume vertically
         full_chart = alt.vconcat(
@@ -399,20 +484,43 @@ def run_cycle():
         # ============================================================
         with indicator_container:
             if strategy_name == "RSI":
-                st.line_chart(df[["rsi"]])
+                st.line_chart(df_plot[["rsi"]])
 
             if strategy_name == "MACD":
-                st.line_chart(df[["macd", "signal_line", "hist"]])
+                st.line_chart(df_plot[["macd", "signal_line", "hist"]])
 
             if strategy_name == "Momentum":
-                st.line_chart(df[["mom"]])
+                st.line_chart(df_plot[["mom"]])
 
+    except Exception as e:
+        st.error(f"❌ Error ({symbol}): {e}")
+
+
+# Only this fragment re-executes on each refresh; the sidebar and page chrome stay mounted
+@st.fragment(run_every=refresh_sec if st.session_state.running else None)
+def run_cycle():
+    try:
+        df_raw = fetch_ohlc(" ".join(tickers), period, interval)
     except Exception as e:
         st.error(f"❌ Error: {e}")
+        return
+
+    symbols = split_by_ticker(df_raw, tickers)
+    ctx = get_script_run_ctx()
+
+    # Indicator compute runs in worker threads (Polars/NumPy release the GIL)
+    # while the script thread builds and emits charts in watchlist order.
+    with ThreadPoolExecutor(max_workers=min(8, len(symbols)),
+                            initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)) as ex:
+        futures = [(symbol, None if df_sym.empty else ex.submit(prepare_ticker, df_sym))
+                   for symbol, df_sym in symbols]
+        for symbol, prepared in futures:
+            if len(tickers) > 1:
+                st.header(symbol)
+            if prepared is None:
+                st.error(f"❌ No data returned for {symbol}")
+                continue
+            render_ticker(symbol, prepared)
 
 
 run_cycle()
-
-if st.session_state.running:
-    time.sleep(refresh_sec)
-    st.rerun()
\ No newline at end of file